@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Замер времени запуска LBKI CSV: импорт ядра и однократная команда.
+Завершается с кодом 1, если превышен бюджет или при импорте
+загружаются модули, которые должны импортироваться лениво.
+
+  python bench_startup.py            # 15 запусков
+  python bench_startup.py 50         # 50 запусков
+"""
+
+import compileall
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_BUDGET_MS = 25      # Импорт lbki_csv вместе с зависимостями (python -X importtime)
+COMMAND_BUDGET_MS = 60     # python -m lbki_csv count сверх пустого запуска python
+LAZY_MODULES = ['zipfile', 'tempfile', 'hashlib', 'json', 'random', 'concurrent.futures']
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_FILE = os.path.join(HERE, 'test_data.csv')
+
+def run(args):
+    return subprocess.run([sys.executable] + args, cwd=HERE, capture_output=True, text=True)
+
+def import_time_ms():
+    """Накопленное время импорта lbki_csv по python -X importtime."""
+    result = run(['-X', 'importtime', '-c', 'import lbki_csv'])
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == 'lbki_csv':
+            return int(parts[1]) / 1000
+    raise RuntimeError(result.stderr)
+
+def wall_time_ms(args):
+    start = time.perf_counter()
+    result = run(args)
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return elapsed
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    compileall.compile_file(os.path.join(HERE, 'lbki_csv.py'), quiet=1)
+
+    loaded = run(['-c', 'import sys, lbki_csv; print(" ".join(m for m in %r if m in sys.modules))'
+                  % LAZY_MODULES]).stdout.split()
+    import_ms = statistics.median(import_time_ms() for _ in range(runs))
+    python_ms = statistics.median(wall_time_ms(['-c', 'pass']) for _ in range(runs))
+    command_ms = statistics.median(wall_time_ms(['-m', 'lbki_csv', 'count', SAMPLE_FILE])
+                                   for _ in range(runs)) - python_ms
+
+    ok = True
+    print(f"Запусков: {runs}")
+    print(f"Импорт lbki_csv:            {import_ms:6.1f} мс (бюджет {IMPORT_BUDGET_MS} мс)")
+    print(f"python -m lbki_csv count:   {command_ms:6.1f} мс сверх пустого python ({python_ms:.1f} мс), "
+          f"бюджет {COMMAND_BUDGET_MS} мс")
+    if import_ms > IMPORT_BUDGET_MS or command_ms > COMMAND_BUDGET_MS:
+        print("✗ Бюджет времени запуска превышен")
+        ok = False
+    if loaded:
+        print(f"✗ При импорте загружены модули, которые должны быть ленивыми: {', '.join(loaded)}")
+        ok = False
+    if ok:
+        print("✓ Бюджет соблюдён")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,11 +2,24 @@
 """
 Ядро LBKI CSV - инструмента: чтение, обработка, запись.
 Используется и CLI, и GUI.
+
+Быстрый неинтерактивный запуск (для cron и ETL):
+  python -m lbki_csv count data.csv
+  python -m lbki_csv head data.csv 10
+  python -m lbki_csv convert data.csv out.csv --to cp1251 --out-delim comma
+
+Тяжёлые модули (zipfile, tempfile, hashlib, json, random, пул процессов)
+импортируются при первом использовании, чтобы не замедлять запуск.
 """
 
 import csv
+import math
+import operator
 import os
-import zipfile
+import sys
+import time
+from array import array
+from datetime import date
 
 # === Определение кодировки и разделителя ===
 
@@ -57,12 +70,14 @@ def read_csv(file_path, delimiter=None):
     except Exception:
         return None, None, None, None
 
-def write_csv(file_path, headers, rows, encoding='utf-8', delimiter=','):
-    """Сохраняем CSV с указанным разделителем."""
+def write_csv(file_path, headers, rows, encoding='utf-8', delimiter=',', append=False, lineterminator='\r\n'):
+    """Сохраняем CSV с указанным разделителем.
+    append=True — дописываем строки в конец существующего файла (без заголовка)."""
     try:
-        with open(file_path, 'w', encoding=encoding, newline='') as f:
-            writer = csv.writer(f, delimiter=delimiter)
-            writer.writerow(headers)
+        with open(file_path, 'a' if append else 'w', encoding=encoding, newline='') as f:
+            writer = csv.writer(f, delimiter=delimiter, lineterminator=lineterminator)
+            if not append:
+                writer.writerow(headers)
             writer.writerows(rows)
         return True
     except Exception:
@@ -105,18 +120,689 @@ def remove_duplicates(headers, rows):
             unique_rows.append(row)
     return headers, unique_rows
 
-def group_by_column(headers, rows, col_name):
-    """Свод по столбцу."""
+def group_by_column(headers, rows, col_name, count_dict=None):
+    """Свод по столбцу.
+    count_dict — счётчики с прошлых вызовов (пополняется), для свода по частям."""
     if col_name not in headers:
         return None, None
     idx = headers.index(col_name)
-    count_dict = {}
+    if count_dict is None:
+        count_dict = {}
     for row in rows:
         key = row[idx].strip()
         count_dict[key] = count_dict.get(key, 0) + 1
     result = [["Значение", "Количество"]] + [[k, str(v)] for k, v in sorted(count_dict.items())]
     return result[0], result[1:]
 
+# === Быстрый подсчёт строк (без разбора CSV) ===
+
+COUNT_BLOCK_SIZE = 8 * 1024 * 1024        # Размер блока чтения, байт
+COUNT_PARALLEL_MIN = 64 * 1024 * 1024     # Файлы меньше этого считаем в одном процессе
+
+_QUOTE = ord('"')
+_OUTSIDE, _INSIDE, _CLOSED = 0, 1, 2   # Вне кавычек / внутри / сразу после закрывающей
+
+def _quote_segments(parts, state, prev, delim):
+    """Разметка частей block.split(b'"') по правилам csv.reader → (outside, state, prev).
+    Кавычка открывает значение только в начале поля (после разделителя, перевода
+    строки или в начале диапазона, prev=None); в остальных местах вне кавычек она —
+    обычный символ. Внутри кавычек "" — экранированная кавычка.
+    outside[i] — лежит ли часть i вне кавычек; state и prev — для следующего блока."""
+    outside = []
+    for i, part in enumerate(parts):
+        if i:
+            if state == _INSIDE:
+                state = _CLOSED
+            elif state == _CLOSED and prev == _QUOTE:
+                state = _INSIDE    # "" внутри значения
+            elif prev is None or prev == delim or prev == 10 or prev == 13:
+                state = _INSIDE
+            else:
+                state = _OUTSIDE   # Случайная кавычка внутри поля без кавычек
+            prev = _QUOTE
+        outside.append(state != _INSIDE)
+        if part:
+            if state == _CLOSED:
+                state = _OUTSIDE
+            prev = part[-1]
+    return outside, state, prev
+
+def _line_breaks(data):
+    """Концы записей: \\n, \\r\\n и одиночный \\r (read_csv читает файл с универсальными переводами строк)."""
+    count = data.count(b'\n')
+    if b'\r' in data:
+        count += data.count(b'\r') - data.count(b'\r\n')
+    return count
+
+def _count_range(file_path, start, end, delimiter, block_size=COUNT_BLOCK_SIZE):
+    """Считаем концы записей вне кавычек в диапазоне байт [start, end) за одно чтение.
+    Диапазон начинается с начала строки файла, но неизвестно, внутри ли он
+    значения в кавычках, поэтому каждый блок размечается для обоих вариантов
+    (для start == 0 — только вне кавычек) →
+    ((строк, внутри_в_конце) при старте вне кавычек, то же при старте внутри или None)."""
+    delim = ord(delimiter)
+    scans = [[_OUTSIDE, None, 0]]      # [состояние, последний байт, строк] для каждого варианта
+    if start:
+        scans.append([_INSIDE, 10, 0])
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(block_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            parts = block.split(b'"') if b'"' in block else None
+            for scan in scans:
+                state, prev, count = scan
+                if prev == 13 and block[0] == 10 and state != _INSIDE:
+                    count -= 1  # \r\n разрезан границей блоков
+                if parts is None:
+                    if state != _INSIDE:
+                        count += _line_breaks(block)
+                        state = _OUTSIDE
+                    prev = block[-1]
+                else:
+                    outside, state, prev = _quote_segments(parts, state, prev, delim)
+                    count += sum(_line_breaks(p) for p, out in zip(parts, outside) if out)
+                scan[:] = state, prev, count
+    results = [(count, state == _INSIDE) for state, _, count in scans]
+    return results[0], (results[1] if start else None)
+
+def _line_bounds(file_path, size, parts):
+    """Делим файл на parts диапазонов, сдвигая границы сразу за перевод строки
+    (так граница не разрежет многобайтовый символ и не попадёт в середину поля)."""
+    bounds = [0]
+    with open(file_path, 'rb') as f:
+        for i in range(1, parts):
+            f.seek(max(size * i // parts, bounds[-1]))
+            f.readline()
+            pos = f.tell()
+            if pos < size and pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def _range_states(results):
+    """Склеиваем результаты _count_range по порядку →
+    (всего строк, [внутри ли кавычек на старте каждого диапазона], внутри ли в конце)."""
+    records = 0
+    in_quotes = False
+    starts = []
+    for from_outside, from_inside in results:
+        starts.append(in_quotes)
+        count, in_quotes = from_inside if in_quotes else from_outside
+        records += count
+    return records, starts, in_quotes
+
+def fast_count_rows(file_path, delimiter=None, workers=None):
+    """Подсчёт строк без загрузки файла → (rows, cols, size).
+    Считаются концы записей вне кавычек в сырых байтах: \\n, \\r\\n и одиночный \\r
+    (кавычка открывает значение только в начале поля, как в csv.reader), большие
+    файлы — параллельно по диапазонам байт, каждый читается один раз.
+    Ответ совпадает с count_rows после read_csv."""
+    headers, _, delimiter = _read_header(file_path, delimiter)
+    if headers is None:
+        return None, None, None
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return 0, 0, 0
+
+    workers = workers or os.cpu_count() or 1
+    if size < COUNT_PARALLEL_MIN or workers < 2:
+        results = [_count_range(file_path, 0, size, delimiter)]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        bounds = _line_bounds(file_path, size, workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_count_range, [file_path] * len(bounds),
+                                    [b[0] for b in bounds], [b[1] for b in bounds],
+                                    [delimiter] * len(bounds)))
+
+    records, _, in_quotes = _range_states(results)
+    with open(file_path, 'rb') as f:
+        f.seek(size - 1)
+        if in_quotes or f.read(1) not in (b'\n', b'\r'):
+            records += 1  # Последняя запись без перевода строки или с незакрытой кавычкой
+    return max(records - 1, 0), len(headers), size
+
+# === Быстрая конвертация кодировки и разделителя ===
+
+CONVERT_BLOCK_SIZE = 8 * 1024 * 1024      # Размер блока чтения, байт
+CONVERT_PARALLEL_MIN = 64 * 1024 * 1024   # Файлы меньше этого конвертируем в одном процессе
+
+class _NeedsQuoting(Exception):
+    """Нужна перезапись через csv: новый разделитель встречается в значении без кавычек
+    или кавычка не закрыта до конца файла."""
+
+def _convert_range(src_path, dst_path, start, end, in_quotes, src_encoding, encoding,
+                   src_delimiter, delimiter, block_size=CONVERT_BLOCK_SIZE):
+    """Конвертируем байты [start, end) исходного файла в dst_path без разбора на строки.
+    in_quotes — находится ли начало диапазона (начало строки файла) внутри кавычек.
+    Кавычки разбираются по тем же правилам, что и в _count_range.
+    Возвращает False, если нужна перезапись через csv (см. _NeedsQuoting)."""
+    import codecs
+    swap = src_delimiter != delimiter
+    transcode = _codec_name(src_encoding) != _codec_name(encoding)
+    old, new = src_delimiter.encode('ascii'), delimiter.encode('ascii')
+    table = bytes.maketrans(old, new)
+    delim = ord(src_delimiter)
+    decoder = codecs.getincrementaldecoder(src_encoding)()
+    encoder = codecs.getincrementalencoder(encoding)()
+    if start:
+        encoder.setstate(0)  # BOM (utf-16, utf-8-sig) пишется только в начале файла
+    state, prev = (_INSIDE, 10) if in_quotes else (_OUTSIDE, None)
+
+    def rewrite(block):
+        nonlocal state, prev
+        if b'"' not in block:
+            if state == _INSIDE:
+                prev = block[-1]
+                return block
+            if new in block:
+                raise _NeedsQuoting()
+            state, prev = _OUTSIDE, block[-1]
+            return block.translate(table)
+        parts = block.split(b'"')
+        outside, state, prev = _quote_segments(parts, state, prev, delim)
+        for i, out in enumerate(outside):
+            if out:
+                if new in parts[i]:
+                    raise _NeedsQuoting()
+                parts[i] = parts[i].translate(table)
+        return b'"'.join(parts)
+
+    try:
+        with open(src_path, 'rb') as f, open(dst_path, 'wb') as out:
+            f.seek(start)
+            if start == 0:
+                if f.read(3) != codecs.BOM_UTF8:
+                    f.seek(0)
+                else:
+                    prev = codecs.BOM_UTF8[-1]  # read_csv читает BOM как часть первого поля
+                    if not transcode:
+                        out.write(codecs.BOM_UTF8)  # При смене кодировки BOM UTF-8 отбрасываем
+            remaining = end - f.tell()
+            while remaining > 0:
+                block = f.read(min(block_size, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                if swap:
+                    block = rewrite(block)
+                if transcode:
+                    block = encoder.encode(decoder.decode(block))
+                out.write(block)
+            if swap and state == _INSIDE and not f.read(1):
+                raise _NeedsQuoting()  # Кавычка не закрыта до конца файла
+            if transcode:
+                out.write(encoder.encode(decoder.decode(b'', final=True), final=True))
+        return True
+    except _NeedsQuoting:
+        return False
+
+def _codec_name(encoding):
+    import codecs
+    return codecs.lookup(encoding).name
+
+def _line_terminator(file_path):
+    """Перевод строки файла по первой строке: '\\r\\n', '\\n' или '\\r'."""
+    with open(file_path, 'rb') as f:
+        chunk = f.read(64 * 1024)
+    i = chunk.find(b'\n')
+    if i >= 0:
+        return '\r\n' if i and chunk[i - 1] == 13 else '\n'
+    return '\r' if b'\r' in chunk else '\r\n'
+
+def convert_csv(src_path, dst_path, encoding=None, delimiter=None, src_delimiter=None, workers=None):
+    """Смена кодировки и/или разделителя без разбора на строки → True/False.
+    encoding/delimiter — для результата (None — как в исходном файле).
+    Файл читается большими блоками, разделитель заменяется только вне кавычек,
+    перекодировка идёт инкрементальными кодеками; большие файлы — параллельно по
+    диапазонам байт. Если новый разделитель встречается в значении без кавычек
+    или кавычка не закрыта до конца файла, файл переписывается обычным путём
+    через read_csv/write_csv. Результат пишется во временный файл и заменяет
+    dst_path только целиком, поэтому при ошибке прежний dst_path не портится."""
+    src_encoding = detect_encoding(src_path)
+    if not src_encoding:
+        return False
+    if src_delimiter is None:
+        src_delimiter = detect_delimiter(src_path, src_encoding)
+    encoding = encoding or src_encoding
+    delimiter = delimiter or src_delimiter
+    if len(src_delimiter) != 1 or len(delimiter) != 1 or not (src_delimiter + delimiter).isascii() \
+            or '"' in (src_delimiter, delimiter):
+        return False
+
+    temp_path = dst_path + '.tmp'
+    try:
+        size = os.path.getsize(src_path)
+        workers = workers or os.cpu_count() or 1
+        if size < CONVERT_PARALLEL_MIN or workers < 2:
+            ok = _convert_range(src_path, temp_path, 0, size, 0, src_encoding, encoding,
+                                src_delimiter, delimiter)
+        else:
+            ok = _convert_parallel(src_path, temp_path, size, workers, src_encoding, encoding,
+                                   src_delimiter, delimiter)
+        if not ok:
+            headers, rows, _, _ = read_csv(src_path, src_delimiter)
+            if headers is None:
+                return False
+            if headers and _codec_name(src_encoding) != _codec_name(encoding):
+                headers[0] = headers[0].lstrip('\ufeff')  # Как и быстрый путь, BOM при перекодировке отбрасываем
+            if not write_csv(temp_path, headers, rows, encoding, delimiter,
+                             lineterminator=_line_terminator(src_path)):
+                return False
+        os.replace(temp_path, dst_path)
+        return True
+    except (OSError, UnicodeError, LookupError):
+        return False
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def _convert_parallel(src_path, dst_path, size, workers, src_encoding, encoding, src_delimiter, delimiter):
+    """Параллельная конвертация: сначала чётность кавычек по диапазонам (состояние
+    на каждой границе), затем каждый диапазон — в свою часть, части склеиваются."""
+    import shutil
+    from concurrent.futures import ProcessPoolExecutor
+    bounds = _line_bounds(src_path, size, workers)
+    starts = [b[0] for b in bounds]
+    ends = [b[1] for b in bounds]
+    part_paths = [f"{dst_path}.part{i}" for i in range(len(bounds))]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            n = len(bounds)
+            if src_delimiter != delimiter:
+                _, starts_inside, _ = _range_states(pool.map(_count_range, [src_path] * n, starts, ends,
+                                                          [src_delimiter] * n))
+                in_quotes = [int(inside) for inside in starts_inside]
+            else:
+                in_quotes = [0] * n
+            results = list(pool.map(_convert_range, [src_path] * n, part_paths, starts, ends,
+                                    in_quotes, [src_encoding] * n, [encoding] * n,
+                                    [src_delimiter] * n, [delimiter] * n))
+        if not all(results):
+            return False
+        with open(dst_path, 'wb') as out:
+            for part in part_paths:
+                with open(part, 'rb') as f:
+                    shutil.copyfileobj(f, out, CONVERT_BLOCK_SIZE)
+        return True
+    finally:
+        for part in part_paths:
+            if os.path.exists(part):
+                os.remove(part)
+
+# === Инкрементальная обработка дописываемых файлов ===
+
+CHECKPOINT_SUFFIX = '.checkpoint.json'  # Контрольная точка лежит рядом с результатом
+HASHES_SUFFIX = '.checkpoint.hashes'    # Хеши уникальных строк (array('Q')), только дописываются
+CHECKPOINT_HEAD_BYTES = 64 * 1024       # По началу файла определяем, что он переписан
+CHECKPOINT_VERSION = 2                  # Меняется вместе с форматом контрольной точки и хеша строк
+INCREMENTAL_BATCH = 10000               # Строк в одной порции обработки
+
+def _row_hasher():
+    """Функция устойчивого между запусками 64-битного хеша строки (для дублей в контрольной точке).
+    Хешируется repr(row), чтобы границы полей не терялись (['a,b'] и ['a', 'b'] — разные строки).
+    hashlib импортируется один раз на запуск, а не на каждую строку."""
+    from hashlib import blake2b
+    def row_hash(row):
+        return int.from_bytes(blake2b(repr(row).encode('utf-8'), digest_size=8).digest(), 'big')
+    return row_hash
+
+def _head_digest(file_path, length):
+    import hashlib
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+def _load_checkpoint(checkpoint_path):
+    import json
+    try:
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save_checkpoint(checkpoint_path, state):
+    import json
+    temp_path = checkpoint_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(temp_path, checkpoint_path)
+
+def _load_hashes(hashes_path, count):
+    """Хеши из файла рядом с контрольной точкой → множество или None.
+    Хеши, дописанные после последнего сохранения контрольной точки, отбрасываются."""
+    hashes = array('Q')
+    try:
+        with open(hashes_path, 'rb') as f:
+            hashes.fromfile(f, count)
+    except (OSError, EOFError, ValueError):
+        return None
+    return set(hashes)
+
+def _checkpoint_valid(state, file_path, output_path, operation, col_name):
+    """Можно ли продолжить с контрольной точки, а не считать всё заново.
+    Повреждённая или чужая контрольная точка — просто повод пересчитать."""
+    if not isinstance(state, dict) or state.get('version') != CHECKPOINT_VERSION \
+            or state.get('operation') != operation or state.get('column') != col_name:
+        return False
+    try:
+        if not os.path.isfile(output_path) or os.path.getsize(output_path) < state['output_size']:
+            return False
+        if os.path.getsize(file_path) < state['offset']:
+            return False  # Файл обрезан
+        if not (isinstance(state['headers'], list) and isinstance(state['counts'], dict)
+                and isinstance(state['rows'], int) and isinstance(state['hash_count'], int)):
+            return False
+        return _head_digest(file_path, state['head_len']) == state['head_digest']
+    except Exception:
+        return False
+
+def _iter_complete_rows(f, encoding, delimiter):
+    """Строки из бинарного файла с позицией конца каждой записи → (row, offset).
+    Недописанная последняя запись (без перевода строки или с открытой кавычкой) пропускается;
+    другие ошибки разбора (csv.Error) пробрасываются — иначе смещение застрянет на плохой строке."""
+    state = {'quotes': 0, 'eof': False}
+    def lines():
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            state['quotes'] += line.count(b'"')
+            yield line.decode(encoding)
+        state['eof'] = True
+    for row in csv.reader(lines(), delimiter=delimiter):
+        if state['eof'] and state['quotes'] % 2:
+            return  # Кавычка последней записи не закрыта — запись недописана
+        state['quotes'] = 0
+        if row:
+            yield row, f.tell()
+
+def incremental_process(file_path, output_path, operation, col_name=None, delimiter=None):
+    """Инкрементальное удаление дублей ('dedup') или свод по столбцу ('group')
+    для дописываемого файла → (new_rows, total_rows, full_rerun).
+    Рядом с output_path хранится контрольная точка: смещение в байтах, число строк
+    и счётчики свода, а хеши уникальных строк — в отдельном двоичном файле, который
+    только дописывается. Следующий запуск читает только дописанные байты;
+    если файл обрезан или переписан — всё считается заново."""
+    if operation not in ('dedup', 'group'):
+        return None, None, None
+    checkpoint_path = output_path + CHECKPOINT_SUFFIX
+    hashes_path = output_path + HASHES_SUFFIX
+
+    try:
+        state = _load_checkpoint(checkpoint_path)
+        full_rerun = not _checkpoint_valid(state, file_path, output_path, operation, col_name)
+        seen = None
+        if not full_rerun and operation == 'dedup':
+            seen = _load_hashes(hashes_path, state['hash_count'])
+            full_rerun = seen is None
+
+        if full_rerun:
+            headers, encoding, delimiter = _read_header(file_path, delimiter)
+            if headers is None or (operation == 'group' and col_name not in headers):
+                return None, None, None
+            state = {
+                'version': CHECKPOINT_VERSION,
+                'source': os.path.abspath(file_path), 'operation': operation, 'column': col_name,
+                'headers': headers, 'encoding': encoding, 'delimiter': delimiter,
+                'offset': 0, 'rows': 0, 'output_size': 0, 'hash_count': 0, 'counts': {},
+            }
+            seen = set() if operation == 'dedup' else None
+        headers, encoding, delimiter = state['headers'], state['encoding'], state['delimiter']
+        counts = state['counts']
+        row_hash = _row_hasher() if operation == 'dedup' else None
+
+        if operation == 'dedup':
+            if full_rerun:
+                write_csv(output_path, headers, [], encoding, delimiter)
+            else:
+                with open(output_path, 'r+b') as out:
+                    out.truncate(state['output_size'])  # Отбрасываем недописанное прошлым запуском
+            with open(hashes_path, 'ab') as f:
+                f.truncate(state['hash_count'] * 8)
+
+        new_rows = 0
+        offset = state['offset']
+        with open(file_path, 'rb') as f:
+            f.seek(offset)
+            if full_rerun:
+                if not f.readline().endswith(b'\n'):
+                    return 0, 0, True  # Заголовок ещё не дописан
+                offset = f.tell()
+            batch = []
+            for row, offset in _iter_complete_rows(f, encoding, delimiter):
+                batch.append(row)
+                if len(batch) >= INCREMENTAL_BATCH:
+                    new_rows += _incremental_batch(output_path, state, batch, seen, row_hash, counts, col_name)
+                    batch = []
+            new_rows += _incremental_batch(output_path, state, batch, seen, row_hash, counts, col_name)
+        state['offset'] = offset
+
+        if operation == 'group':
+            h, r = group_by_column(headers, [], col_name, counts)
+            if not write_csv(output_path, h, r, encoding, delimiter):
+                return None, None, None
+        else:
+            state['hash_count'] = len(seen)
+
+        state['rows'] += new_rows
+        state['output_size'] = os.path.getsize(output_path)
+        state['head_len'] = min(state['offset'], CHECKPOINT_HEAD_BYTES)
+        state['head_digest'] = _head_digest(file_path, state['head_len'])
+        _save_checkpoint(checkpoint_path, state)
+        return new_rows, state['rows'], full_rerun
+    except Exception:
+        return None, None, None
+
+def _incremental_batch(output_path, state, batch, seen, row_hash, counts, col_name):
+    """Обрабатываем порцию новых строк: дописываем уникальные или пополняем счётчики."""
+    if not batch:
+        return 0
+    headers = state['headers']
+    if seen is not None:
+        fresh = array('Q')
+        unique = []
+        for row in batch:
+            key = row_hash(row)
+            if key not in seen:
+                seen.add(key)
+                fresh.append(key)
+                unique.append(row)
+        if not write_csv(output_path, headers, unique, state['encoding'], state['delimiter'], append=True):
+            raise OSError(f"Не удалось дописать {output_path}")
+        with open(output_path + HASHES_SUFFIX, 'ab') as f:
+            fresh.tofile(f)
+    else:
+        group_by_column(headers, batch, col_name, counts)
+    return len(batch)
+
+# === Приближённая статистика (для очень больших файлов) ===
+
+HLL_PRECISION = 12          # 2^12 регистров, стандартная ошибка ~1.6%
+APPROX_TOP_K = 20           # Сколько частых значений возвращать
+APPROX_CHECK_EVERY = 10000  # Как часто (в строках) проверять бюджет времени и байт
+
+class HyperLogLog:
+    """Оценка числа уникальных значений в фиксированной памяти (2^precision регистров)."""
+    def __init__(self, precision=HLL_PRECISION):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+
+    def add(self, value):
+        h = hash(value) & 0xFFFFFFFFFFFFFFFF
+        idx = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def count(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Поправка для малых значений
+        return int(round(estimate))
+
+    def error(self):
+        """Относительная стандартная ошибка оценки."""
+        return 1.04 / math.sqrt(self.m)
+
+class HeavyHitters:
+    """Частые значения (алгоритм Misra-Gries) в памяти на capacity счётчиков.
+    Каждый счётчик занижен не больше чем на self.decremented."""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.decremented = 0
+
+    def add(self, value):
+        counts = self.counts
+        if value in counts:
+            counts[value] += 1
+        elif len(counts) < self.capacity:
+            counts[value] = 1
+        else:
+            # Вычитаем 1 из всех счётчиков и освобождаем обнулившиеся;
+            # в сумме таких проходов не больше N / capacity
+            self.decremented += 1
+            for key in [k for k, v in counts.items() if v <= 1]:
+                del counts[key]
+            for key in counts:
+                counts[key] -= 1
+
+    def top(self, k):
+        """k самых частых → [(значение, нижняя оценка, верхняя оценка)]."""
+        best = sorted(self.counts.items(), key=lambda kv: -kv[1])[:k]
+        return [(value, count, count + self.decremented) for value, count in best]
+
+class Reservoir:
+    """Равномерная случайная выборка n строк из потока (reservoir sampling)."""
+    def __init__(self, size, seed=None):
+        import random
+        self.size = size
+        self.seen = 0
+        self.items = []
+        self.random = random.Random(seed)
+
+    def add(self, item):
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+        else:
+            j = self.random.randrange(self.seen)
+            if j < self.size:
+                self.items[j] = item
+
+def approx_scan(file_path, delimiter=None, group_column=None, top_k=APPROX_TOP_K,
+                sample_size=0, distinct=True, precision=HLL_PRECISION,
+                time_budget=None, byte_budget=None):
+    """Один потоковый проход с фиксированной памятью → dict со статистикой или None.
+    distinct — HyperLogLog по каждому столбцу, group_column — частые значения,
+    sample_size > 0 — случайная выборка строк. Считается только запрошенное.
+    Проход останавливается раньше, если исчерпан time_budget (сек) или byte_budget (байт);
+    тогда complete=False: количества строк и частых значений — экстраполированные
+    оценки без гарантированных границ, а выборка — только из прочитанной части файла."""
+    headers, encoding, delimiter = _read_header(file_path, delimiter)
+    if headers is None:
+        return None
+    group_idx = None
+    if group_column is not None:
+        if group_column not in headers:
+            return None
+        group_idx = headers.index(group_column)
+
+    sketches = [HyperLogLog(precision) for _ in headers] if distinct else None
+    hitters = HeavyHitters(top_k * 10) if group_idx is not None else None
+    reservoir = Reservoir(sample_size) if sample_size > 0 else None
+    file_size = os.path.getsize(file_path)
+    deadline = time.monotonic() + time_budget if time_budget else None
+    rows_seen = 0
+    complete = True
+
+    try:
+        with open(file_path, 'r', encoding=encoding, newline='') as f:
+            reader = csv.reader(f, delimiter=delimiter)
+            next(reader, None)
+            for row in reader:
+                if not row:
+                    continue
+                rows_seen += 1
+                if sketches is not None:
+                    for sketch, value in zip(sketches, row):
+                        sketch.add(value)
+                if hitters is not None and group_idx < len(row):
+                    hitters.add(row[group_idx].strip())
+                if reservoir is not None:
+                    reservoir.add(row)
+                if rows_seen % APPROX_CHECK_EVERY == 0:
+                    # Позиция буфера под текстовым потоком — с точностью до блока чтения
+                    if (byte_budget and f.buffer.tell() >= byte_budget) or \
+                       (deadline and time.monotonic() >= deadline):
+                        complete = False
+                        break
+            bytes_read = file_size if complete else min(f.buffer.tell(), file_size)
+    except Exception:
+        return None
+
+    scale = file_size / bytes_read if bytes_read else 1.0
+    result = {
+        'headers': headers,
+        'encoding': encoding,
+        'delimiter': delimiter,
+        'complete': complete,
+        'file_size': file_size,
+        'bytes_read': bytes_read,
+        'rows_seen': rows_seen,
+        'rows_estimate': int(rows_seen * scale),
+        'distinct': [(s.count(), s.error()) for s in sketches] if sketches is not None else None,
+        'top': None,
+        'sample': reservoir.items if reservoir is not None else None,
+    }
+    if hitters is not None:
+        if complete:
+            result['top'] = hitters.top(top_k)
+        else:
+            # Экстраполяция: одна оценка вместо границ (high — None)
+            result['top'] = [(value, int((low + high) / 2 * scale), None)
+                             for value, low, high in hitters.top(top_k)]
+    return result
+
+def approx_count_distinct(file_path, delimiter=None, **budget):
+    """Оценка числа уникальных значений по столбцам → (headers, rows)."""
+    stats = approx_scan(file_path, delimiter, **budget)
+    if stats is None:
+        return None, None
+    rows = [[name, str(est), f"±{err:.1%}"] for name, (est, err) in zip(stats['headers'], stats['distinct'])]
+    return ["Столбец", "Уникальных (оценка)", "Ошибка"], rows
+
+def approx_group_by_column(file_path, col_name, top_k=APPROX_TOP_K, delimiter=None, **budget):
+    """Приближённый свод по столбцу: top_k частых значений → (headers, rows).
+    При полном проходе — нижняя и верхняя граница количества, при остановке
+    по бюджету — одна экстраполированная оценка. Точная версия — group_by_column."""
+    stats = approx_scan(file_path, delimiter, group_column=col_name, top_k=top_k,
+                        distinct=False, **budget)
+    if stats is None:
+        return None, None
+    if stats['complete']:
+        rows = [[value, str(low), str(high)] for value, low, high in stats['top']]
+        return ["Значение", "Количество (от)", "Количество (до)"], rows
+    rows = [[value, str(estimate)] for value, estimate, _ in stats['top']]
+    return ["Значение", "Количество (оценка)"], rows
+
+def sample_rows(file_path, n, delimiter=None, **budget):
+    """Случайная выборка n строк за один проход → (headers, rows).
+    Приближённая замена get_first_n для просмотра больших файлов;
+    при остановке по бюджету выборка — только из прочитанной части."""
+    stats = approx_scan(file_path, delimiter, sample_size=n, distinct=False, **budget)
+    if stats is None:
+        return None, None
+    return stats['headers'], stats['sample']
+
 def split_into_chunks(headers, rows, chunk_size):
     """Делим на части."""
     chunks = []
@@ -126,6 +812,7 @@ def split_into_chunks(headers, rows, chunk_size):
 
 def zip_chunks(chunks, headers, base_name, zip_name):
     """Упаковка частей в ZIP."""
+    import zipfile
     temp_dir = "temp_split_parts"
     os.makedirs(temp_dir, exist_ok=True)
     files_to_zip = []
@@ -148,3 +835,514 @@ def zip_chunks(chunks, headers, base_name, zip_name):
         return True
     except Exception:
         return False
+
+
+# === Соединение двух CSV (join) ===
+
+JOIN_MEMORY_LIMIT = 32 * 1024 * 1024   # Размер стороны построения на диске, байт (в памяти — в разы больше)
+JOIN_MAX_PARTITIONS = 256               # Не больше стольких партиций за один проход
+JOIN_MAX_DEPTH = 3                      # Глубина повторного разбиения партиций
+
+def _iter_rows(file_path, encoding, delimiter, skip_header=True):
+    """Потоково отдаём непустые строки CSV-файла."""
+    with open(file_path, 'r', encoding=encoding, newline='') as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        if skip_header:
+            next(reader, None)
+        for row in reader:
+            if row:
+                yield row
+
+def _read_header(file_path, delimiter=None):
+    """Читаем только заголовок → (headers, encoding, delimiter).
+    Кодировка и разделитель определяются так же, как в read_csv."""
+    encoding = detect_encoding(file_path)
+    if not encoding:
+        return None, None, None
+    if delimiter is None:
+        delimiter = detect_delimiter(file_path, encoding)
+    try:
+        with open(file_path, 'r', encoding=encoding, newline='') as f:
+            headers = next(csv.reader(f, delimiter=delimiter), [])
+        return headers, encoding, delimiter
+    except Exception:
+        return None, None, None
+
+def _key_getter(indices):
+    """Функция, возвращающая кортеж значений по индексам (короткие строки дополняются '')."""
+    def key(row):
+        try:
+            return tuple([row[i] for i in indices])
+        except IndexError:
+            return tuple([row[i] if i < len(row) else '' for i in indices])
+    return key
+
+def _hash_join(left_rows, right_rows, lkey, rkey, rest, pad, how, build_left):
+    """Хеш-соединение в памяти: таблица строится по одной стороне, другая читается потоком.
+    pad — чем дополняются строки левой стороны без пары."""
+    table = {}
+    if build_left:
+        for row in left_rows:
+            table.setdefault(lkey(row), []).append(row)
+        matched = set()
+        for row in right_rows:
+            key = rkey(row)
+            lefts = table.get(key)
+            if lefts is None:
+                continue
+            matched.add(key)
+            if how != 'anti':
+                extra = list(rest(row))
+                for left in lefts:
+                    yield left + extra
+        if how != 'inner':
+            for key, lefts in table.items():
+                if key not in matched:
+                    for left in lefts:
+                        yield left + pad
+    else:
+        for row in right_rows:
+            table.setdefault(rkey(row), []).append(list(rest(row)))
+        for row in left_rows:
+            extras = table.get(lkey(row))
+            if extras is None:
+                if how != 'inner':
+                    yield row + pad
+            elif how != 'anti':
+                for extra in extras:
+                    yield row + extra
+
+def _partition(source, key, n, temp_dir, salt):
+    """Раскладываем строки источника по n временным файлам по хешу ключа."""
+    paths = [os.path.join(temp_dir, f"part_{i}.csv") for i in range(n)]
+    files = [open(p, 'w', encoding='utf-8', newline='') for p in paths]
+    try:
+        writers = [csv.writer(f) for f in files]
+        for row in _iter_rows(*source):
+            writers[hash((salt, key(row))) % n].writerow(row)
+    finally:
+        for f in files:
+            f.close()
+    return [(p, 'utf-8', ',', False) for p in paths]
+
+def _grace_join(left, right, lkey, rkey, rest, pad, how, memory_limit, temp_dir, depth=0):
+    """Grace hash join: если меньшая сторона не помещается в memory_limit,
+    оба источника разбиваются на партиции, и каждая пара соединяется отдельно."""
+    left_size = os.path.getsize(left[0])
+    right_size = os.path.getsize(right[0])
+    build_left = left_size < right_size
+    build_size = min(left_size, right_size)
+
+    if build_size <= memory_limit or depth >= JOIN_MAX_DEPTH:
+        yield from _hash_join(_iter_rows(*left), _iter_rows(*right),
+                              lkey, rkey, rest, pad, how, build_left)
+        return
+
+    import tempfile
+    n = min(JOIN_MAX_PARTITIONS, build_size // memory_limit + 2)
+    left_dir = tempfile.mkdtemp(dir=temp_dir)
+    right_dir = tempfile.mkdtemp(dir=temp_dir)
+    left_parts = _partition(left, lkey, n, left_dir, depth)
+    right_parts = _partition(right, rkey, n, right_dir, depth)
+    for left_part, right_part in zip(left_parts, right_parts):
+        yield from _grace_join(left_part, right_part, lkey, rkey, rest, pad, how,
+                               memory_limit, temp_dir, depth + 1)
+        os.remove(left_part[0])
+        os.remove(right_part[0])
+    os.rmdir(left_dir)
+    os.rmdir(right_dir)
+
+def join_csv(left_path, right_path, left_keys, right_keys=None, how='inner',
+             left_delimiter=None, right_delimiter=None, memory_limit=JOIN_MEMORY_LIMIT):
+    """Соединение двух CSV по ключевым столбцам → (headers, rows, encoding, delimiter).
+    how: 'inner', 'left' или 'anti' (строки левого файла без пары).
+    rows — генератор; encoding и delimiter — левого файла.
+    Хеш-таблица строится по меньшему файлу, больший читается потоком.
+    Если меньший файл больше memory_limit байт — grace hash join через временные файлы.
+    memory_limit сравнивается с размером CSV на диске; списки строк Python занимают
+    в памяти примерно в 5–10 раз больше, поэтому лимит по умолчанию небольшой.
+    Столбцы правого файла, совпадающие по имени с уже имеющимися, получают суффикс _2.
+    Порядок строк результата не гарантируется."""
+    if how not in ('inner', 'left', 'anti'):
+        return None, None, None, None
+    if right_keys is None:
+        right_keys = left_keys
+    if not left_keys or len(left_keys) != len(right_keys):
+        return None, None, None, None
+
+    left_headers, left_enc, left_delim = _read_header(left_path, left_delimiter)
+    right_headers, right_enc, right_delim = _read_header(right_path, right_delimiter)
+    if left_headers is None or right_headers is None:
+        return None, None, None, None
+    if any(k not in left_headers for k in left_keys) or any(k not in right_headers for k in right_keys):
+        return None, None, None, None
+
+    lkey = _key_getter([left_headers.index(k) for k in left_keys])
+    rkey = _key_getter([right_headers.index(k) for k in right_keys])
+    rest_idx = [i for i, h in enumerate(right_headers) if h not in right_keys]
+    rest = _key_getter(rest_idx)
+    headers = list(left_headers)
+    if how != 'anti':
+        for i in rest_idx:
+            name = right_headers[i]
+            suffix = 2
+            while name in headers:
+                name = f"{right_headers[i]}_{suffix}"
+                suffix += 1
+            headers.append(name)
+    pad = [''] * len(rest_idx) if how == 'left' else []
+
+    def rows():
+        import tempfile
+        with tempfile.TemporaryDirectory(prefix="lbki_join_") as temp_dir:
+            yield from _grace_join((left_path, left_enc, left_delim, True),
+                                   (right_path, right_enc, right_delim, True),
+                                   lkey, rkey, rest, pad, how, memory_limit, temp_dir)
+
+    return headers, rows(), left_enc, left_delim
+
+
+# === Типизация столбцов ===
+
+TYPE_SAMPLE_SIZE = 1000      # Сколько строк смотрим при определении типов
+TYPE_MATCH_SHARE = 0.95      # Доля разобранных значений в выборке, чтобы принять тип
+CATEGORY_MAX_SHARE = 0.5     # Категория, если уникальных значений не больше этой доли
+NULL_VALUES = {'', 'null', 'none', 'nan', 'n/a', 'na', '-'}
+COLUMN_TYPES = ('int', 'float', 'date', 'category', 'str')
+
+def _parse_float(value):
+    return float(value.replace(',', '.'))
+
+def _parse_date_iso(value):
+    return date.fromisoformat(value).toordinal()
+
+def _parse_date_dots(value):
+    d, m, y = value.split('.')
+    return date(int(y), int(m), int(d)).toordinal()
+
+def _parse_date_slashes(value):
+    d, m, y = value.split('/')
+    return date(int(y), int(m), int(d)).toordinal()
+
+DATE_FORMATS = {
+    '%Y-%m-%d': _parse_date_iso,
+    '%d.%m.%Y': _parse_date_dots,
+    '%d/%m/%Y': _parse_date_slashes,
+}
+
+def _pick_decimal(values):
+    """Десятичный разделитель столбца: ',' если запятых больше, чем точек."""
+    commas = sum(',' in v for v in values)
+    return ',' if commas > sum('.' in v for v in values) else '.'
+
+def _is_null(value):
+    return value.strip().lower() in NULL_VALUES
+
+def _parsed_share(parse, values):
+    """Доля значений, которые разбираются функцией parse."""
+    ok = 0
+    for value in values:
+        try:
+            parse(value)
+            ok += 1
+        except (ValueError, OverflowError):
+            pass
+    return ok / len(values) if values else 0
+
+def _pick_date_format(values, min_share=TYPE_MATCH_SHARE):
+    """Формат даты, под который подходит больше всего значений (или None)."""
+    best_fmt, best_share = None, 0
+    for fmt, parse in DATE_FORMATS.items():
+        share = _parsed_share(parse, values)
+        if share > best_share:
+            best_fmt, best_share = fmt, share
+    return best_fmt if best_share >= min_share and best_share > 0 else None
+
+class TypedColumn:
+    """Столбец, хранящийся в типизированном массиве.
+    int → array('q'), float → array('d'), date → array('i') с ordinal дат,
+    category → коды array('I') + список categories, str → обычный список.
+    Пустые и неразобранные значения отмечаются в nulls (bytearray).
+    Текст значения восстанавливается по формату столбца (date_format, decimal);
+    исходный текст ячеек, которые так не восстанавливаются (ошибки, 'null',
+    ' 07 ', '1.50' и т.п.), хранится в raw — as_text вернёт его без потерь."""
+    TYPECODES = {'int': 'q', 'float': 'd', 'date': 'i', 'category': 'I'}
+
+    def __init__(self, kind, date_format=None, decimal='.'):
+        if kind not in COLUMN_TYPES:
+            raise ValueError(f"Неизвестный тип столбца: {kind}")
+        self.kind = kind
+        self.date_format = date_format or '%Y-%m-%d'
+        self.decimal = decimal or '.'
+        self.values = array(self.TYPECODES[kind]) if kind in self.TYPECODES else []
+        self.nulls = bytearray()
+        self.categories = []
+        self.null_count = 0
+        self.invalid_count = 0
+        self.raw = {}
+        self._codes = {}
+        if kind == 'int':
+            self._parse = int
+        elif kind == 'float':
+            self._parse = _parse_float
+        elif kind == 'date':
+            self._parse = DATE_FORMATS[self.date_format]
+        else:
+            self._parse = None
+
+    def append(self, raw):
+        """Добавляем значение из CSV (строку), разбирая его по типу столбца."""
+        if _is_null(raw):
+            self.null_count += 1
+            if raw:
+                self.raw[len(self.nulls)] = raw
+            self.values.append(raw if self.kind == 'str' else 0)
+            self.nulls.append(1)
+            return
+        if self.kind == 'str':
+            self.values.append(raw)
+            self.nulls.append(0)
+            return
+        if self.kind == 'category':
+            code = self._codes.get(raw)
+            if code is None:
+                code = self._codes[raw] = len(self.categories)
+                self.categories.append(raw)
+            self.values.append(code)
+            self.nulls.append(0)
+            return
+        try:
+            value = self._parse(raw.strip())
+            self.values.append(value)
+        except (ValueError, OverflowError):
+            self.invalid_count += 1
+            self.raw[len(self.nulls)] = raw
+            self.values.append(0)
+            self.nulls.append(1)
+            return
+        if self._format(value) != raw:
+            self.raw[len(self.nulls)] = raw
+        self.nulls.append(0)
+
+    def _format(self, value):
+        """Текст значения из массива по формату столбца (int, float, date)."""
+        if self.kind == 'date':
+            return date.fromordinal(value).strftime(self.date_format)
+        if self.kind == 'float' and self.decimal != '.':
+            return str(value).replace('.', self.decimal)
+        return str(value)
+
+    def __len__(self):
+        return len(self.nulls)
+
+    def __getitem__(self, i):
+        """Значение как объект Python (int, float, date, str) или None."""
+        if self.nulls[i]:
+            return None
+        value = self.values[i]
+        if self.kind == 'date':
+            return date.fromordinal(value)
+        if self.kind == 'category':
+            return self.categories[value]
+        return value
+
+    def as_text(self, i):
+        """Значение обратно в строку для записи в CSV (исходный текст ячейки)."""
+        if i in self.raw:
+            return self.raw[i]
+        if self.nulls[i]:
+            return ''
+        if self.kind == 'category':
+            return self.categories[self.values[i]]
+        if self.kind == 'str':
+            return self.values[i]
+        return self._format(self.values[i])
+
+def infer_column_type(values):
+    """Определяем тип по выборке строк → (kind, date_format, decimal)."""
+    values = [v.strip() for v in values if not _is_null(v)]
+    if not values:
+        return 'str', None, None
+    if _parsed_share(int, values) >= TYPE_MATCH_SHARE:
+        return 'int', None, None
+    if _parsed_share(_parse_float, values) >= TYPE_MATCH_SHARE:
+        return 'float', None, _pick_decimal(values)
+    date_format = _pick_date_format(values)
+    if date_format:
+        return 'date', date_format, None
+    if len(set(values)) <= len(values) * CATEGORY_MAX_SHARE:
+        return 'category', None, None
+    return 'str', None, None
+
+def infer_schema(headers, rows, sample_size=TYPE_SAMPLE_SIZE, overrides=None):
+    """Схема по первым sample_size строкам → {столбец: (kind, date_format, decimal)}.
+    overrides — {столбец: тип} для ручного задания типа."""
+    sample = rows[:sample_size]
+    overrides = overrides or {}
+    schema = {}
+    for i, name in enumerate(headers):
+        values = [row[i] for row in sample if i < len(row)]
+        if name in overrides:
+            kind = overrides[name]
+            if kind not in COLUMN_TYPES:
+                return None
+            values = [v.strip() for v in values if not _is_null(v)]
+            date_format = _pick_date_format(values, 0) if kind == 'date' else None
+            decimal = _pick_decimal(values) if kind == 'float' else None
+            schema[name] = (kind, date_format, decimal)
+        else:
+            schema[name] = infer_column_type(values)
+    return schema
+
+def _append_rows(columns, rows):
+    """Дописываем строки в типизированные столбцы."""
+    width = len(columns)
+    for row in rows:
+        if len(row) < width:
+            row = row + [''] * (width - len(row))
+        for column, value in zip(columns, row):
+            column.append(value)
+
+def to_typed_columns(headers, rows, schema):
+    """Переводим строки в список TypedColumn (в порядке headers)."""
+    columns = [TypedColumn(*schema[name]) for name in headers]
+    _append_rows(columns, rows)
+    return columns
+
+def read_csv_typed(file_path, delimiter=None, overrides=None, sample_size=TYPE_SAMPLE_SIZE):
+    """Читаем CSV сразу в типизированные столбцы → (headers, columns, encoding, delimiter).
+    Типы определяются по первым sample_size строкам, остальные строки
+    читаются потоком, без хранения строковых списков."""
+    headers, encoding, delimiter = _read_header(file_path, delimiter)
+    if headers is None:
+        return None, None, None, None
+    try:
+        rows = _iter_rows(file_path, encoding, delimiter)
+        sample = [row for _, row in zip(range(sample_size), rows)]
+        schema = infer_schema(headers, sample, sample_size, overrides)
+        if schema is None:
+            return None, None, None, None
+        columns = to_typed_columns(headers, sample, schema)
+        _append_rows(columns, rows)
+        return headers, columns, encoding, delimiter
+    except Exception:
+        return None, None, None, None
+
+def typed_rows(headers, columns):
+    """Обратно в (headers, rows) с исходным текстом ячеек — для write_csv и прочих функций."""
+    count = len(columns[0]) if columns else 0
+    return headers, [[c.as_text(i) for c in columns] for i in range(count)]
+
+def column_report(headers, columns):
+    """Отчёт по столбцам: тип, число пустых и неразобранных значений."""
+    result = [["Столбец", "Тип", "Пустых", "Ошибок"]]
+    for name, column in zip(headers, columns):
+        kind = column.kind
+        if kind == 'date':
+            kind += f" ({column.date_format})"
+        elif kind == 'float' and column.decimal != '.':
+            kind += f" ({column.decimal})"
+        elif kind == 'category':
+            kind += f" ({len(column.categories)})"
+        result.append([name, kind, str(column.null_count), str(column.invalid_count)])
+    return result[0], result[1:]
+
+COMPARE_OPS = {
+    '=': operator.eq, '!=': operator.ne,
+    '>': operator.gt, '>=': operator.ge,
+    '<': operator.lt, '<=': operator.le,
+}
+
+def compare_column(column, op, value):
+    """Индексы строк, где значение столбца удовлетворяет условию (column op value).
+    value — строка; разбирается один раз по типу столбца, пустые значения не проходят."""
+    compare = COMPARE_OPS.get(op)
+    if compare is None:
+        return None
+    if column.kind == 'category':
+        if op not in ('=', '!='):
+            return None
+        code = column._codes.get(value, -1)
+    elif column.kind == 'str':
+        code = value
+    else:
+        try:
+            code = column._parse(value.strip())
+        except (ValueError, OverflowError):
+            return None
+    values = column.values
+    nulls = column.nulls
+    return [i for i, v in enumerate(values) if not nulls[i] and compare(v, code)]
+
+
+# === Неинтерактивная точка входа: python -m lbki_csv ===
+
+USAGE = """Использование: python -m lbki_csv <команда> <файл.csv> [...]
+  count <файл.csv>          # Строк, столбцов, размер в байтах (через табуляцию)
+  head <файл.csv> [N]       # Первые N строк (по умолчанию 10) в CSV
+  schema <файл.csv>         # Тип, пустых, ошибок по каждому столбцу
+  convert <файл.csv> <output.csv> [--to utf-8|cp1251] [--out-delim comma|semicolon|tab|space|colon]"""
+
+# Имена разделителей в аргументах командной строки (общие для lbki_csv_cli и lbki_csv_gui)
+DELIMITER_NAMES = {'comma': ',', 'semicolon': ';', 'tab': '\t', 'space': ' ', 'colon': ':'}
+
+def _fail(message):
+    print(f"✗ {message}", file=sys.stderr)
+    return 1
+
+def main(argv=None):
+    """Одна команда без меню: вывод для скриптов в stdout, ошибки в stderr.
+    Возвращает код выхода (0 — успех, 1 — ошибка, 2 — неверные аргументы)."""
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2:
+        print(USAGE, file=sys.stderr)
+        return 2
+    command, file_path, args = argv[0], argv[1], argv[2:]
+    if not os.path.isfile(file_path):
+        return _fail(f"Файл не найден: {file_path}")
+
+    if command == 'count' and not args:
+        cnt, cols, size = fast_count_rows(file_path)
+        if cnt is None:
+            return _fail("Не удалось прочитать файл")
+        print(f"{cnt}\t{cols}\t{size}")
+
+    elif command == 'head' and len(args) <= 1:
+        try:
+            n = int(args[0]) if args else 10
+        except ValueError:
+            return _fail("Введите число")
+        headers, encoding, delimiter = _read_header(file_path)
+        if headers is None:
+            return _fail("Не удалось прочитать файл")
+        writer = csv.writer(sys.stdout, delimiter=delimiter, lineterminator='\n')
+        writer.writerow(headers)
+        for _, row in zip(range(n), _iter_rows(file_path, encoding, delimiter)):
+            writer.writerow(row)
+
+    elif command == 'schema' and not args:
+        headers, columns, _, _ = read_csv_typed(file_path)
+        if headers is None:
+            return _fail("Не удалось прочитать файл")
+        h, rows = column_report(headers, columns)
+        for row in [h] + rows:
+            print("\t".join(row))
+
+    elif command == 'convert' and args and len(args) % 2 == 1:
+        options = dict(zip(args[1::2], args[2::2]))
+        if set(options) - {'--to', '--out-delim'}:
+            print(USAGE, file=sys.stderr)
+            return 2
+        delimiter = options.get('--out-delim')
+        if delimiter is not None and delimiter not in DELIMITER_NAMES:
+            return _fail(f"Неизвестный разделитель: {delimiter}")
+        if not convert_csv(file_path, args[0], options.get('--to'), DELIMITER_NAMES.get(delimiter)):
+            return _fail("Ошибка при конвертации")
+
+    else:
+        print(USAGE, file=sys.stderr)
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Библиотечный API LBKI CSV для встраивания в ETL (Airflow, скрипты, asyncio).
+Ленивый Dataset: операции только записываются в план и выполняются
+одним потоковым проходом при итерации, collect(), count() или write().
+Ошибки — исключения LBKICSVError (FileNotFoundError для отсутствующего файла), а не None.
+
+Пример:
+    from lbki_csv_api import Dataset
+
+    n = (Dataset.from_csv("data.csv")
+         .filter("Москва")
+         .select("Имя", "Город")
+         .dedup()
+         .write("result.csv"))
+
+    async for row in Dataset.from_csv("data.csv").filter("СПб"):
+        ...
+"""
+
+import itertools
+from lbki_csv import (_read_header, _iter_rows, group_by_column, write_csv)
+
+ASYNC_BATCH_SIZE = 1000  # Строк за один переход в пул потоков
+
+class LBKICSVError(ValueError):
+    """Ошибка чтения, записи или неверные параметры операции."""
+
+def _next_batch(rows, size):
+    return list(itertools.islice(rows, size))
+
+class Dataset:
+    """Ленивый набор данных: заголовок + источник строк + план операций.
+    Методы filter/select/dedup/head/group_by возвращают новый Dataset,
+    исходный не меняется. Заголовки и столбцы проверяются сразу при построении плана."""
+
+    def __init__(self, headers, source, encoding='utf-8', delimiter=',', steps=()):
+        self.headers = list(headers)
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self._source = source    # Функция без аргументов → итератор строк
+        self._steps = tuple(steps)
+
+    @classmethod
+    def from_csv(cls, file_path, delimiter=None):
+        """Dataset из файла; кодировка и разделитель определяются как в read_csv."""
+        headers, encoding, delimiter = _read_header(file_path, delimiter)
+        if headers is None:
+            raise LBKICSVError(f"Не удалось прочитать файл: {file_path}")
+        return cls(headers, lambda: _iter_rows(file_path, encoding, delimiter), encoding, delimiter)
+
+    @classmethod
+    def from_rows(cls, headers, rows, encoding='utf-8', delimiter=','):
+        """Dataset из списков в памяти (например, результата read_csv)."""
+        return cls(headers, lambda: iter(rows), encoding, delimiter)
+
+    def _then(self, headers, step):
+        return Dataset(headers, self._source, self.encoding, self.delimiter, self._steps + (step,))
+
+    def _index(self, column):
+        if column not in self.headers:
+            raise LBKICSVError(f"Столбец не найден: {column}")
+        return self.headers.index(column)
+
+    # --- Операции плана ---
+
+    def filter(self, query):
+        """Оставить строки, где есть подстрока query (без учёта регистра, как filter_by_text),
+        или для которых query(row) истинно, если передана функция."""
+        if callable(query):
+            return self._then(self.headers, lambda rows: (row for row in rows if query(row)))
+        query = query.lower()
+        return self._then(self.headers, lambda rows: (
+            row for row in rows if any(query in cell.lower() for cell in row)))
+
+    def select(self, *columns):
+        """Оставить столбцы в указанном порядке."""
+        indices = [self._index(c) for c in columns]
+        def step(rows):
+            for row in rows:
+                yield [row[i] if i < len(row) else '' for i in indices]
+        return self._then([self.headers[i] for i in indices], step)
+
+    def dedup(self):
+        """Удалить полные дубли, сохраняя первое вхождение."""
+        def step(rows):
+            seen = set()
+            for row in rows:
+                key = tuple(row)
+                if key not in seen:
+                    seen.add(key)
+                    yield row
+        return self._then(self.headers, step)
+
+    def head(self, n):
+        """Первые n строк (чтение файла прекращается после n-й строки)."""
+        return self._then(self.headers, lambda rows: itertools.islice(rows, n))
+
+    def group_by(self, column):
+        """Свод по столбцу: значение и количество (как group_by_column).
+        Строки потребляются потоком, в памяти остаются только счётчики.
+        Строка, в которой нет этого столбца, — LBKICSVError."""
+        idx = self._index(column)
+        headers = self.headers
+        def checked(rows):
+            for row in rows:
+                if len(row) <= idx:
+                    raise LBKICSVError(f"В строке нет столбца {column}: {row}")
+                yield row
+        def step(rows):
+            _, result = group_by_column(headers, checked(rows), column)
+            return iter(result)
+        return self._then(["Значение", "Количество"], step)
+
+    # --- Выполнение ---
+
+    def __iter__(self):
+        """Один проход по источнику через все операции плана."""
+        rows = self._source()
+        for step in self._steps:
+            rows = step(rows)
+        return iter(rows)
+
+    def collect(self):
+        """Выполнить план → (headers, rows), как функции lbki_csv."""
+        return self.headers, list(self)
+
+    def count(self):
+        """Число строк результата."""
+        return sum(1 for _ in self)
+
+    def write(self, file_path, encoding=None, delimiter=None):
+        """Выполнить план и записать результат потоком → число строк.
+        По умолчанию — кодировка и разделитель источника.
+        Ошибка при выполнении плана не выдаётся за ошибку записи: исходное
+        LBKICSVError пробрасывается как есть, остальные — с причиной в __cause__."""
+        counter = itertools.count()
+        plan_error = []
+        def rows():
+            try:
+                for row, _ in zip(self, counter):
+                    yield row
+            except Exception as e:
+                plan_error.append(e)
+                raise
+        if not write_csv(file_path, self.headers, rows(), encoding or self.encoding, delimiter or self.delimiter):
+            if not plan_error:
+                raise LBKICSVError(f"Не удалось записать файл: {file_path}")
+            if isinstance(plan_error[0], LBKICSVError):
+                raise plan_error[0]
+            raise LBKICSVError(f"Ошибка при выполнении операций: {plan_error[0]!r}") from plan_error[0]
+        return next(counter)
+
+    # --- Асинхронные варианты ---
+
+    async def batches(self, size=ASYNC_BATCH_SIZE):
+        """Асинхронно отдаёт списки строк; чтение и обработка идут в пуле потоков,
+        не блокируя цикл событий."""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        rows = iter(self)
+        while True:
+            batch = await loop.run_in_executor(None, _next_batch, rows, size)
+            if not batch:
+                return
+            yield batch
+
+    async def __aiter__(self):
+        async for batch in self.batches():
+            for row in batch:
+                yield row
+
+    async def acollect(self):
+        """Асинхронный collect() → (headers, rows)."""
+        rows = []
+        async for batch in self.batches():
+            rows.extend(batch)
+        return self.headers, rows
+
+    async def awrite(self, file_path, encoding=None, delimiter=None):
+        """Асинхронный write() → число строк."""
+        import asyncio
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.write, file_path, encoding, delimiter)
+
+    def __repr__(self):
+        return f"Dataset({len(self.headers)} столбцов, {len(self._steps)} операций)"
@@ -8,6 +8,12 @@ CLI версия LBKI CSV: Консольный интерфейс.
   python lbki_csv_cli.py data.csv --delim semicolon                  # Интерактивный с разделителем
   python lbki_csv_cli.py data.csv 4 5 8 output.csv                   # Пакетный режим
   python lbki_csv_cli.py data.csv --delim tab 4 5 8 output.csv       # Пакетный с разделителем
+  python lbki_csv_cli.py --join data.csv ref.csv Город left out.csv  # Соединение с эталонным файлом
+  python lbki_csv_cli.py --schema data.csv Возраст=int               # Типы столбцов и ошибки
+  python lbki_csv_cli.py --approx data.csv Город --time 10           # Приближённая статистика
+  python lbki_csv_cli.py --count data.csv                            # Быстрый подсчёт строк
+  python lbki_csv_cli.py --incremental log.csv group Город out.csv   # Только дописанные строки
+  python lbki_csv_cli.py --convert data.csv out.csv --to cp1251      # Смена кодировки/разделителя
 """
 
 import sys
@@ -32,17 +38,7 @@ def print_menu():
 
 def parse_delimiter(delim_arg):
     """Парсит аргумент разделителя"""
-    if delim_arg == "comma":
-        return ","
-    elif delim_arg == "semicolon":
-        return ";"
-    elif delim_arg == "tab":
-        return "\t"
-    elif delim_arg == "space":
-        return " "
-    elif delim_arg == "colon":
-        return ":"
-    return None
+    return DELIMITER_NAMES.get(delim_arg)
 
 def execute_action(action, headers, rows, original_headers, original_rows):
     """Выполняет действие и возвращает (headers, rows, should_continue)"""
@@ -225,13 +221,201 @@ def batch_mode(file_path, actions, output_file, delimiter=None, output_delimiter
     else:
         print(f"\n✓ Финальные данные: {len(headers)} столбцов, {len(rows)} строк")
 
+def join_mode(args):
+    """Соединение двух файлов: <left.csv> <right.csv> <ключи> [inner|left|anti] <output.csv>
+    Ключи через запятую; разные имена в файлах задаются как левый=правый."""
+    if len(args) < 4:
+        print("✗ Использование: --join <left.csv> <right.csv> <ключи> [inner|left|anti] <output.csv>")
+        return
+    left_path, right_path, keys_arg = args[0], args[1], args[2]
+    how = args[3] if len(args) > 4 else 'inner'
+    output_file = args[-1]
+    
+    for path in (left_path, right_path):
+        if not os.path.isfile(path):
+            print(f"✗ Файл не найден: {path}")
+            return
+    
+    left_keys = []
+    right_keys = []
+    for pair in keys_arg.split(','):
+        left_key, _, right_key = pair.partition('=')
+        left_keys.append(left_key.strip())
+        right_keys.append((right_key or left_key).strip())
+    
+    print(f"\n[LBKI CSV] Соединение ({how}): {left_path} + {right_path}")
+    headers, rows, encoding, delimiter = join_csv(left_path, right_path, left_keys, right_keys, how)
+    if headers is None:
+        print("✗ Ошибка: не удалось прочитать файлы, неверные ключи или тип соединения")
+        return
+    
+    if not output_file.endswith('.csv'):
+        output_file += '.csv'
+    if write_csv(output_file, headers, rows, encoding, delimiter):
+        print(f"✓ Результат сохранён: {output_file} ({len(headers)} столбцов)")
+    else:
+        print("✗ Ошибка при соединении или сохранении")
+
+def schema_mode(args):
+    """Типы столбцов: <файл.csv> [столбец=тип ...]"""
+    if not args or not os.path.isfile(args[0]):
+        print("✗ Использование: --schema <файл.csv> [столбец=тип ...]")
+        return
+    overrides = {}
+    for arg in args[1:]:
+        name, _, kind = arg.partition('=')
+        overrides[name.strip()] = kind.strip()
+    
+    print(f"\n[LBKI CSV] Типы столбцов: {args[0]}")
+    headers, columns, encoding, delimiter = read_csv_typed(args[0], overrides=overrides)
+    if headers is None:
+        print(f"✗ Не удалось прочитать файл (типы: {', '.join(COLUMN_TYPES)})")
+        return
+    
+    rows_count = len(columns[0]) if columns else 0
+    print(f"✓ Кодировка: {encoding}, Разделитель: {repr(delimiter)}, Строк: {rows_count}")
+    h, r = column_report(headers, columns)
+    print("\t".join(h))
+    for row in r:
+        print("\t".join(row))
+
+def approx_mode(args):
+    """Приближённая статистика: <файл.csv> [столбец] [--time сек] [--bytes N] [--sample N]"""
+    if not args or not os.path.isfile(args[0]):
+        print("✗ Использование: --approx <файл.csv> [столбец] [--time сек] [--bytes N] [--sample N]")
+        return
+    file_path = args[0]
+    column = None
+    options = {'time': None, 'bytes': None, 'sample': 0}
+    rest = args[1:]
+    try:
+        while rest:
+            if rest[0].startswith('--') and len(rest) > 1:
+                options[rest[0][2:]] = float(rest[1]) if rest[0] == '--time' else int(rest[1])
+                rest = rest[2:]
+            else:
+                column = rest[0]
+                rest = rest[1:]
+    except ValueError:
+        print("✗ Введите число")
+        return
+    
+    print(f"\n[LBKI CSV] Приближённая статистика: {file_path}")
+    stats = approx_scan(file_path, group_column=column, sample_size=options['sample'],
+                        time_budget=options['time'], byte_budget=options['bytes'])
+    if stats is None:
+        print("✗ Не удалось прочитать файл или столбец не найден")
+        return
+    
+    if stats['complete']:
+        print(f"✓ Строк: {stats['rows_seen']}")
+    else:
+        share = stats['bytes_read'] / stats['file_size']
+        print(f"✓ Прочитано {share:.1%} файла, строк: {stats['rows_seen']}, оценка всего: ~{stats['rows_estimate']}")
+    print("\nСтолбец\tУникальных (оценка)")
+    for name, (estimate, error) in zip(stats['headers'], stats['distinct']):
+        print(f"{name}\t~{estimate} (±{error:.1%})")
+    if stats['top'] is not None:
+        if stats['complete']:
+            print(f"\n✓ Частые значения '{column}' (количество от–до):")
+            for value, low, high in stats['top']:
+                print(f"{value}\t{low}–{high}")
+        else:
+            print(f"\n✓ Частые значения '{column}' (экстраполированная оценка, без границ):")
+            for value, estimate, _ in stats['top']:
+                print(f"{value}\t~{estimate}")
+    if stats['sample']:
+        part = "" if stats['complete'] else " из прочитанной части файла"
+        print(f"\n✓ Случайная выборка{part} ({len(stats['sample'])} строк):")
+        print("\t".join(stats['headers']))
+        for row in stats['sample']:
+            print("\t".join(row))
+
+def count_mode(args):
+    """Быстрый подсчёт строк: <файл.csv> [--delim <delim>]"""
+    if not args or not os.path.isfile(args[0]):
+        print("✗ Использование: --count <файл.csv> [--delim <delim>]")
+        return
+    delimiter = parse_delimiter(args[2]) if len(args) > 2 and args[1] == "--delim" else None
+    cnt, cols, size = fast_count_rows(args[0], delimiter)
+    if cnt is None:
+        print("✗ Не удалось прочитать файл")
+        return
+    print(f"✓ Строк: {cnt}, Столбцов: {cols}, Размер: {size} байт")
+
+def incremental_mode(args):
+    """Инкрементальная обработка: <файл.csv> dedup <output.csv> | <файл.csv> group <столбец> <output.csv>"""
+    if len(args) < 3 or not os.path.isfile(args[0]) or args[1] not in ('dedup', 'group') \
+            or (args[1] == 'group' and len(args) < 4):
+        print("✗ Использование: --incremental <файл.csv> dedup <output.csv>")
+        print("                 --incremental <файл.csv> group <столбец> <output.csv>")
+        return
+    file_path, operation = args[0], args[1]
+    col_name = args[2] if operation == 'group' else None
+    output_file = args[-1]
+    if not output_file.endswith('.csv'):
+        output_file += '.csv'
+    
+    print(f"\n[LBKI CSV] Инкрементальная обработка ({operation}): {file_path}")
+    new_rows, total_rows, full_rerun = incremental_process(file_path, output_file, operation, col_name)
+    if new_rows is None:
+        print("✗ Ошибка: не удалось прочитать файл, столбец не найден или ошибка записи")
+        return
+    if full_rerun:
+        print("✓ Контрольная точка не найдена или файл переписан — полный пересчёт")
+    print(f"✓ Новых строк: {new_rows}, всего обработано: {total_rows}")
+    print(f"✓ Результат: {output_file}")
+
+def convert_mode(args):
+    """Конвертация: <файл.csv> <output.csv> [--to utf-8|cp1251] [--delim <delim>] [--out-delim <delim>]"""
+    if len(args) < 2 or not os.path.isfile(args[0]) or len(args) % 2 == 1:
+        print("✗ Использование: --convert <файл.csv> <output.csv> [--to utf-8|cp1251] [--delim <delim>] [--out-delim <delim>]")
+        return
+    file_path, output_file = args[0], args[1]
+    options = dict(zip(args[2::2], args[3::2]))
+    encoding = options.get('--to')
+    delimiter = parse_delimiter(options['--delim']) if '--delim' in options else None
+    output_delimiter = parse_delimiter(options['--out-delim']) if '--out-delim' in options else None
+    
+    print(f"\n[LBKI CSV] Конвертация: {file_path} → {output_file}")
+    if convert_csv(file_path, output_file, encoding, output_delimiter, delimiter):
+        print(f"✓ Сохранено: {output_file} (кодировка: {encoding or 'как в исходном'}, "
+              f"разделитель: {repr(output_delimiter) if output_delimiter else 'как в исходном'})")
+    else:
+        print("✗ Ошибка при конвертации (неподдерживаемая кодировка или символы, которых нет в ней)")
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--convert":
+        convert_mode(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "--incremental":
+        incremental_mode(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "--count":
+        count_mode(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "--approx":
+        approx_mode(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "--join":
+        join_mode(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "--schema":
+        schema_mode(sys.argv[2:])
+        return
+    
     if len(sys.argv) < 2:
         print("Использование:")
         print("  python lbki_csv_cli.py <файл.csv>                                    # Интерактивный режим")
         print("  python lbki_csv_cli.py <файл.csv> --delim <delim>                    # Интерактивный с разделителем")
         print("  python lbki_csv_cli.py <файл.csv> 4 5 8 <output.csv>                 # Пакетный режим")
         print("  python lbki_csv_cli.py <файл.csv> --delim <delim> 4 5 8 <output.csv> # Пакетный с разделителем")
+        print("  python lbki_csv_cli.py --join <left.csv> <right.csv> <ключи> [inner|left|anti] <output.csv>")
+        print("  python lbki_csv_cli.py --schema <файл.csv> [столбец=тип ...]")
+        print("  python lbki_csv_cli.py --approx <файл.csv> [столбец] [--time сек] [--bytes N] [--sample N]")
+        print("  python lbki_csv_cli.py --count <файл.csv> [--delim <delim>]")
+        print("  python lbki_csv_cli.py --incremental <файл.csv> dedup|group [столбец] <output.csv>")
+        print("  python lbki_csv_cli.py --convert <файл.csv> <output.csv> [--to utf-8|cp1251] [--delim <delim>] [--out-delim <delim>]")
         print("\nРазделители:")
         print("  comma, semicolon, tab, space, colon")
         print("\nДействия:")
@@ -374,17 +374,7 @@ if __name__ == "__main__":
         file_path = sys.argv[1]
     if len(sys.argv) > 2:
         # Второй аргумент - разделитель
-        delim_arg = sys.argv[2]
-        if delim_arg == "comma":
-            delimiter = ","
-        elif delim_arg == "semicolon":
-            delimiter = ";"
-        elif delim_arg == "tab":
-            delimiter = "\t"
-        elif delim_arg == "space":
-            delimiter = " "
-        elif delim_arg == "colon":
-            delimiter = ":"
+        delimiter = DELIMITER_NAMES.get(sys.argv[2])
     
     app = LBKICSVApp(root, file_path, delimiter)
     root.mainloop()
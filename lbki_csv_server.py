@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+"""
+Серверная версия LBKI CSV: локальный HTTP/JSON сервис.
+Держит загруженные файлы в памяти (LRU-кэш), чтобы скрипты не платили
+за запуск Python и разбор одного и того же CSV при каждом вызове.
+
+Примеры:
+  python lbki_csv_server.py                                  # 127.0.0.1:8765
+  python lbki_csv_server.py --port 9000 --cache 16           # Порт и размер кэша
+  python lbki_csv_server.py --workers 4 --processes          # Операции в пуле процессов
+  python lbki_csv_server.py --root /data                     # Каталог, из которого отдаются файлы
+
+Запросы:
+  GET  /health                                               # Состояние и содержимое кэша
+  POST /run  {"file": "data.csv", "delimiter": null,
+              "actions": [{"op": "filter", "query": "Москва"},
+                          {"op": "select", "columns": ["Имя", "Город"]},
+                          {"op": "dedup"}]}
+  Операции: count, head (n), filter (query), select (columns), dedup, group (column).
+  Результат — CSV, передаётся частями (chunked); для count — JSON.
+  Путь "file" — относительно --root (по умолчанию текущий каталог), выйти за него нельзя.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit
+from lbki_csv import *
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+CACHE_MAX_FILES = 8           # Сколько наборов данных держим в памяти
+CACHE_MAX_ROWS = 20_000_000   # Суммарный лимит строк в кэше
+STREAM_CHUNK_ROWS = 5000      # Строк в одной части ответа
+MAX_BODY_SIZE = 1024 * 1024   # Ограничение на размер JSON-запроса
+
+def run_actions(headers, rows, actions):
+    """Применяет последовательность операций → (headers, rows) или ('count', (cnt, cols)).
+    Исходные списки не изменяются — они могут лежать в кэше."""
+    for step in actions:
+        op = step.get("op")
+        if op == "count":
+            return "count", count_rows(headers, rows)
+        elif op == "head":
+            headers, rows = get_first_n(headers, rows, int(step.get("n", 10)))
+        elif op == "filter":
+            headers, rows = filter_by_text(headers, rows, str(step.get("query", "")))
+        elif op == "select":
+            h, r = select_columns(headers, rows, list(step.get("columns", [])))
+            if h is None:
+                raise ValueError(f"Неверные столбцы: {step.get('columns')}")
+            headers, rows = h, r
+        elif op == "dedup":
+            headers, rows = remove_duplicates(headers, rows)
+        elif op == "group":
+            h, r = group_by_column(headers, rows, step.get("column"))
+            if h is None:
+                raise ValueError(f"Столбец не найден: {step.get('column')}")
+            headers, rows = h, r
+        else:
+            raise ValueError(f"Неизвестная операция: {op}")
+    return headers, rows
+
+def load_dataset(file_path, delimiter):
+    """Читает файл для кэша → (headers, rows, encoding, delimiter)."""
+    headers, rows, encoding, delimiter = read_csv(file_path, delimiter)
+    if headers is None:
+        raise ValueError(f"Не удалось прочитать файл: {file_path}")
+    return headers, rows, encoding, delimiter
+
+def file_stamp(file_path):
+    """Ключ актуальности записи кэша: размер и время изменения файла."""
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(file_path)
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+def evict_lru(entries, max_files, max_rows):
+    """Выбрасывает самые старые наборы данных, пока не уложимся в лимиты файлов и строк
+    (последний загруженный остаётся в любом случае). entries — OrderedDict key → (stamp, dataset)."""
+    total_rows = sum(len(dataset[1]) for _, dataset in entries.values())
+    while len(entries) > 1 and (len(entries) > max_files or total_rows > max_rows):
+        _, (_, dataset) = entries.popitem(last=False)
+        total_rows -= len(dataset[1])
+
+def format_csv(headers, rows, delimiter):
+    """Часть CSV-ответа в байтах (заголовок, если headers не None, и строки)."""
+    buffer = io.StringIO()
+    csv_writer = csv.writer(buffer, delimiter=delimiter)
+    if headers is not None:
+        csv_writer.writerow(headers)
+    csv_writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+_worker_datasets = OrderedDict()   # Кэш внутри процесса пула: key → (stamp, dataset)
+
+def run_in_worker(file_path, delimiter, stamp, actions, max_files, max_rows):
+    """Выполняется в процессе пула: данные грузятся и хранятся в самом процессе,
+    между процессами передаются только путь, операции и результат.
+    → (headers, rows, delimiter) или ('count', (cnt, cols), delimiter)."""
+    key = (file_path, delimiter)
+    entry = _worker_datasets.get(key)
+    if entry is None or entry[0] != stamp:
+        entry = (stamp, load_dataset(file_path, delimiter))
+        _worker_datasets[key] = entry
+    _worker_datasets.move_to_end(key)
+    evict_lru(_worker_datasets, max_files, max_rows)
+    headers, rows, _, delimiter = entry[1]
+    result_headers, result_rows = run_actions(headers, rows, actions)
+    return result_headers, result_rows, delimiter
+
+class DatasetCache:
+    """LRU-кэш загруженных файлов. Запись устаревает, если у файла изменились
+    размер или время изменения. Одновременные запросы одного файла грузят его один раз."""
+    def __init__(self, executor, max_files=CACHE_MAX_FILES, max_rows=CACHE_MAX_ROWS):
+        self.executor = executor
+        self.max_files = max_files
+        self.max_rows = max_rows
+        self.entries = OrderedDict()   # key → (stamp, dataset)
+        self.loading = {}              # key → asyncio.Future
+        self.hits = 0
+        self.misses = 0
+
+    async def run(self, file_path, delimiter, actions):
+        """Операции над файлом из кэша в пуле потоков → (headers, rows, delimiter)."""
+        headers, rows, _, delimiter = await self.get(file_path, delimiter)
+        result_headers, result_rows = await asyncio.get_running_loop().run_in_executor(
+            self.executor, run_actions, headers, rows, actions)
+        return result_headers, result_rows, delimiter
+
+    async def get(self, file_path, delimiter=None):
+        file_path = os.path.abspath(file_path)
+        stamp = file_stamp(file_path)
+        key = (file_path, delimiter)
+
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        if key in self.loading:
+            return await asyncio.shield(self.loading[key])
+
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.loading[key] = future
+        try:
+            dataset = await loop.run_in_executor(self.executor, load_dataset, file_path, delimiter)
+            self.entries[key] = (stamp, dataset)
+            self.entries.move_to_end(key)
+            self._evict()
+            future.set_result(dataset)
+            return dataset
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Не даём asyncio ругаться на неполученное исключение
+            raise
+        finally:
+            del self.loading[key]
+
+    def _evict(self):
+        evict_lru(self.entries, self.max_files, self.max_rows)
+
+    def info(self):
+        return {
+            "files": [{"file": key[0], "delimiter": key[1], "rows": len(dataset[1])}
+                      for key, (_, dataset) in self.entries.items()],
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+class WorkerDatasets:
+    """Кэш для пула процессов: каждый процесс держит свои загруженные файлы
+    (run_in_worker), чтобы не передавать набор данных через pickle при каждом запросе."""
+    def __init__(self, executor, max_files=CACHE_MAX_FILES, max_rows=CACHE_MAX_ROWS):
+        self.executor = executor
+        self.max_files = max_files
+        self.max_rows = max_rows   # Лимит строк для каждого процесса
+
+    async def run(self, file_path, delimiter, actions):
+        file_path = os.path.abspath(file_path)
+        stamp = file_stamp(file_path)
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, run_in_worker, file_path, delimiter, stamp, actions,
+            self.max_files, self.max_rows)
+
+    def info(self):
+        return {"mode": "processes", "max_files_per_worker": self.max_files,
+                "max_rows_per_worker": self.max_rows}
+
+class LBKICSVServer:
+    def __init__(self, cache, root):
+        self.cache = cache
+        self.root = os.path.realpath(root)
+
+    def resolve(self, file_name):
+        """Путь из запроса → абсолютный путь внутри root; за пределы root не пускаем."""
+        if not isinstance(file_name, str) or not file_name:
+            raise ValueError("'file' — путь к файлу")
+        file_path = os.path.realpath(os.path.join(self.root, file_name))
+        if os.path.commonpath([self.root, file_path]) != self.root:
+            raise PermissionError(file_name)
+        return file_path
+
+    async def handle(self, reader, writer):
+        """Один запрос на соединение (Connection: close)."""
+        try:
+            method, path, body = await self.read_request(reader)
+            if method == "GET" and path == "/health":
+                await self.send_json(writer, HTTPStatus.OK, {"status": "ok", "cache": self.cache.info()})
+            elif method == "POST" and path == "/run":
+                await self.run(writer, json.loads(body or b"{}"))
+            else:
+                await self.send_json(writer, HTTPStatus.NOT_FOUND, {"error": f"Нет такого запроса: {method} {path}"})
+        except FileNotFoundError as e:
+            await self.send_json(writer, HTTPStatus.NOT_FOUND, {"error": f"Файл не найден: {e}"})
+        except PermissionError as e:
+            await self.send_json(writer, HTTPStatus.FORBIDDEN, {"error": f"Файл вне каталога сервера: {e}"})
+        except (ValueError, TypeError, AttributeError) as e:
+            await self.send_json(writer, HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            await self.send_json(writer, HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) < 2:
+            raise ValueError("Неверный HTTP-запрос")
+        method, target = request_line[0], request_line[1]
+        length = 0
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        if length > MAX_BODY_SIZE:
+            raise ValueError("Слишком большой запрос")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), urlsplit(target).path, body
+
+    async def run(self, writer, request):
+        if not isinstance(request, dict) or "file" not in request:
+            raise ValueError("Укажите 'file'")
+        actions = request.get("actions", [])
+        if not isinstance(actions, list) or not all(isinstance(a, dict) for a in actions):
+            raise ValueError("'actions' — список объектов {\"op\": ...}")
+        result_headers, result_rows, delimiter = await self.cache.run(
+            self.resolve(request["file"]), request.get("delimiter"), actions)
+        if result_headers == "count":
+            cnt, cols = result_rows
+            await self.send_json(writer, HTTPStatus.OK, {"rows": cnt, "cols": cols})
+            return
+        out_delim = request.get("out_delimiter") or delimiter
+        await self.stream_csv(writer, result_headers, result_rows, out_delim)
+
+    async def send_json(self, writer, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        writer.write(self.status_line(status, "application/json; charset=utf-8",
+                                      f"Content-Length: {len(body)}\r\n") + body)
+        await writer.drain()
+
+    async def stream_csv(self, writer, headers, rows, delimiter):
+        """Отдаёт CSV частями по STREAM_CHUNK_ROWS строк (Transfer-Encoding: chunked).
+        Каждая часть форматируется в пуле потоков, в цикле событий — только отправка."""
+        writer.write(self.status_line(HTTPStatus.OK, "text/csv; charset=utf-8",
+                                      "Transfer-Encoding: chunked\r\n"))
+        loop = asyncio.get_running_loop()
+        await self.write_chunk(writer, format_csv(headers, [], delimiter))
+        for i in range(0, len(rows), STREAM_CHUNK_ROWS):
+            data = await loop.run_in_executor(
+                None, format_csv, None, rows[i:i + STREAM_CHUNK_ROWS], delimiter)
+            await self.write_chunk(writer, data)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def write_chunk(self, writer, data):
+        if data:
+            writer.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+            await writer.drain()
+
+    def status_line(self, status, content_type, extra):
+        return (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"{extra}"
+                "Connection: close\r\n\r\n").encode("utf-8")
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, max_files=CACHE_MAX_FILES,
+                workers=None, processes=False, root="."):
+    """Запускает сервер и работает до остановки (Ctrl+C)."""
+    if processes:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        cache = WorkerDatasets(executor, max_files)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+        cache = DatasetCache(executor, max_files)
+    with executor:
+        app = LBKICSVServer(cache, root)
+        server = await asyncio.start_server(app.handle, host, port)
+        print(f"[LBKI CSV] Сервер запущен: http://{host}:{port} "
+              f"(каталог: {app.root}, кэш: {max_files} файлов, пул: {'процессы' if processes else 'потоки'})")
+        async with server:
+            await server.serve_forever()
+
+def main():
+    host = DEFAULT_HOST
+    port = DEFAULT_PORT
+    max_files = CACHE_MAX_FILES
+    workers = None
+    processes = False
+    root = "."
+
+    args = sys.argv[1:]
+    try:
+        while args:
+            if args[0] == "--host" and len(args) > 1:
+                host = args[1]
+                args = args[2:]
+            elif args[0] == "--port" and len(args) > 1:
+                port = int(args[1])
+                args = args[2:]
+            elif args[0] == "--cache" and len(args) > 1:
+                max_files = int(args[1])
+                args = args[2:]
+            elif args[0] == "--workers" and len(args) > 1:
+                workers = int(args[1])
+                args = args[2:]
+            elif args[0] == "--root" and len(args) > 1:
+                root = args[1]
+                args = args[2:]
+            elif args[0] == "--processes":
+                processes = True
+                args = args[1:]
+            else:
+                print(f"✗ Неизвестный аргумент: {args[0]}")
+                print("Использование: python lbki_csv_server.py [--host H] [--port P] [--cache N] [--workers N] [--processes] [--root DIR]")
+                sys.exit(1)
+    except ValueError:
+        print("✗ Введите число")
+        sys.exit(1)
+
+    try:
+        if not os.path.isdir(root):
+            print(f"✗ Каталог не найден: {root}")
+            sys.exit(1)
+        asyncio.run(serve(host, port, max_files, workers, processes, root))
+    except KeyboardInterrupt:
+        print("\nСервер остановлен")
+
+if __name__ == "__main__":
+    main()